@@ -2,15 +2,42 @@
 
 from __future__ import annotations
 
+import atexit
+import functools
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Iterable, Optional, Union
 
-from scripts.extract_diagram import extract_diagram
-from scripts.populate_neo4j import populate_neo4j, load_data
+try:
+    from neo4j import GraphDatabase
+except ImportError:
+    GraphDatabase = None
+
+from scripts.extract_diagram import (
+    extract_diagram,
+    extract_diagram_cached,
+    diagram_cache_path,
+    existing_paths,
+)
+from scripts.populate_neo4j import (
+    populate_neo4j,
+    populate_neo4j_bulk,
+    batch_load_data,
+    build_entity_rows,
+    build_relationship_rows,
+    derive_spec_id,
+    intern_row,
+    load_data,
+)
 from scripts.extract_and_populate import extract_and_populate
 
 __all__ = [
     "extract_diagram",
+    "extract_diagram_cached",
     "extract_to_yaml",
     "populate_from_yaml",
     "batch_extract_and_populate",
@@ -18,6 +45,47 @@ __all__ = [
 ]
 
 
+# Lazily-initialized driver cache so repeated populate calls share one
+# connection pool instead of paying a TLS/Bolt handshake per invocation.
+_drivers: dict = {}
+
+
+def _get_driver(
+    uri: str,
+    user: str,
+    password: str,
+    max_connection_pool_size: int = 50,
+):
+    """Return a shared driver for (uri, user), creating it on first use."""
+    if GraphDatabase is None:
+        raise ImportError("neo4j package required. Install with: pip install neo4j")
+
+    key = (uri, user)
+    driver = _drivers.get(key)
+    if driver is None:
+        driver = GraphDatabase.driver(
+            uri,
+            auth=(user, password),
+            max_connection_pool_size=max_connection_pool_size,
+            connection_acquisition_timeout=60,
+            max_connection_lifetime=3600,
+            keep_alive=True,
+            connection_timeout=15.0,
+        )
+        _drivers[key] = driver
+    return driver
+
+
+def close_drivers() -> None:
+    """Close all cached drivers (also registered to run at exit)."""
+    for driver in _drivers.values():
+        driver.close()
+    _drivers.clear()
+
+
+atexit.register(close_drivers)
+
+
 def extract_to_yaml(
     image_path: str,
     output_path: Optional[str] = None,
@@ -32,32 +100,274 @@ def extract_to_yaml(
     )
 
 
+@functools.lru_cache(maxsize=128)
+def _load_data_cached(path: str, mtime: float) -> dict:
+    """Memoized load_data keyed on (path, mtime) so repeated populations
+    of the same unchanged file within a batch skip disk + parse work."""
+    return load_data(path)
+
+
+# Exact-type dispatch for populate_from_yaml: one dict lookup on the hot
+# path, with a single isinstance fallback for Path objects and subclasses.
+_DISPATCH = {
+    str: lambda x: _load_data_cached(x, os.path.getmtime(x)),
+    dict: lambda x: x,
+}
+
+
 def populate_from_yaml(
     yaml_data: Union[str, Path, dict],
+    batch_size: int = 10000,
     **kwargs,
 ):
-    """Populate Neo4j from YAML data or a YAML/JSON file path."""
-    if isinstance(yaml_data, (str, Path)):
-        data = load_data(str(yaml_data))
-    elif isinstance(yaml_data, dict):
-        data = yaml_data
-    else:
-        raise TypeError("yaml_data must be a file path or a dict")
+    """Populate Neo4j from YAML data or a YAML/JSON file path.
 
-    return populate_neo4j(data=data, **kwargs)
+    batch_size controls how many rows each UNWIND transaction carries in
+    the underlying populate_neo4j call.
+    """
+    handler = _DISPATCH.get(type(yaml_data))
+    if handler is None:
+        if isinstance(yaml_data, (str, Path)):
+            handler = _DISPATCH[str]
+            yaml_data = str(yaml_data)
+        elif isinstance(yaml_data, dict):
+            handler = _DISPATCH[dict]
+        else:
+            raise TypeError("yaml_data must be a file path or a dict")
+
+    data = handler(yaml_data)
+
+    return populate_neo4j(data=data, batch_size=batch_size, **kwargs)
 
 
 def batch_extract_and_populate(
     diagrams: Iterable[str],
     merge_strategy: str = "update",
-    **kwargs,
+    neo4j_uri: Optional[str] = None,
+    neo4j_user: Optional[str] = None,
+    neo4j_password: Optional[str] = None,
+    neo4j_database: str = "neo4j",
+    max_connection_pool_size: int = 50,
+    batch_size: int = 10000,
+    max_workers: int = 8,
+    cache_dir: Optional[str] = ".diagram_cache",
+    manifest_path: Optional[str] = ".diagram_manifest.json",
+    async_write: bool = False,
+    **extract_kwargs,
 ):
-    """Process multiple diagrams in sequence."""
+    """
+    Process multiple diagrams with one shared Neo4j driver and bulk writes.
+
+    Extraction is network-bound on the vision API and population is
+    network-bound on Bolt, so the two phases are pipelined: a thread pool
+    extracts diagrams concurrently (max_workers) and feeds a bounded
+    queue, while a single writer thread drains it and flushes chunked
+    UNWIND writes over one connection pool. The writer stays
+    single-threaded since driver sessions are not thread-safe.
+
+    async_write relaxes durability for non-critical ingests: transactions
+    are tagged as deferred and grouped into much larger UNWIND batches.
+    """
     if merge_strategy not in (None, "update"):
         raise ValueError("merge_strategy supports only 'update' in this version")
 
+    if GraphDatabase is None:
+        raise ImportError("neo4j package required. Install with: pip install neo4j")
+
+    neo4j_uri = neo4j_uri or os.getenv("NEO4J_URI", "bolt://localhost:7687")
+    neo4j_user = neo4j_user or os.getenv("NEO4J_USER", "neo4j")
+    neo4j_password = neo4j_password or os.getenv("NEO4J_PASSWORD")
+
+    if not neo4j_password:
+        raise ValueError("Neo4j password required. Provide as argument or set NEO4J_PASSWORD env var.")
+
+    if async_write:
+        batch_size = max(batch_size, 50000)
+
     results = []
-    for diagram_path in diagrams:
-        results.append(extract_and_populate(image_path=diagram_path, **kwargs))
+
+    # Hash-consing tables: overlapping diagrams repeat entities and
+    # relationships, so duplicates are dropped before any Bolt traffic.
+    ent_table = {}
+    rel_table = {}
+
+    driver = _get_driver(
+        neo4j_uri,
+        neo4j_user,
+        neo4j_password,
+        max_connection_pool_size=max_connection_pool_size,
+    )
+
+    # Already-extracted JSON/YAML cache files skip the vision API and
+    # are loaded with overlapped reads instead
+    diagrams = list(diagrams)
+    data_paths = [
+        p for p in diagrams
+        if Path(p).suffix.lower() in (".json", ".yaml", ".yml")
+    ]
+    data_set = set(data_paths)
+    image_paths = [p for p in diagrams if p not in data_set]
+
+    # One scandir pass per directory instead of a stat() per diagram
+    found = existing_paths(image_paths)
+    for p in image_paths:
+        if p not in found:
+            print(f"Skipping {p} (not found)")
+    image_paths = [p for p in image_paths if p in found]
+
+    # Incremental mode: skip re-extraction for diagrams whose (mtime, size)
+    # matches the manifest and whose cached extraction still exists
+    manifest = {}
+    use_manifest = bool(manifest_path and cache_dir)
+    if use_manifest and os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+
+    if use_manifest:
+        changed_images = []
+        for p in image_paths:
+            st = os.stat(p)
+            entry = manifest.get(p)
+            if (entry
+                    and entry.get("mtime") == st.st_mtime
+                    and entry.get("size") == st.st_size
+                    and os.path.exists(entry.get("extracted_json", ""))):
+                data_paths.append(entry["extracted_json"])
+            else:
+                changed_images.append(p)
+        image_paths = changed_images
+
+    # Bounded queue between extractor producers and the single writer;
+    # None is the completion sentinel.
+    work_queue: queue.Queue = queue.Queue(maxsize=2 * max_workers)
+    writer_errors: list = []
+
+    def _writer():
+        pending_entities = []
+        pending_rels = []
+        pending_blocks = []
+        first_flush = True
+
+        def flush():
+            nonlocal first_flush
+            if not (pending_entities or pending_rels or pending_blocks):
+                return
+            populate_neo4j_bulk(
+                driver,
+                pending_entities,
+                pending_rels,
+                schema_blocks=pending_blocks,
+                database=neo4j_database,
+                batch_size=batch_size,
+                create_constraints_flag=first_flush,
+                create_indexes_flag=first_flush,
+                deferred=async_write,
+            )
+            first_flush = False
+            pending_entities.clear()
+            pending_rels.clear()
+            pending_blocks.clear()
+
+        try:
+            while True:
+                item = work_queue.get()
+                if item is None:
+                    break
+                new_entities, new_rels, schema_block = item
+                pending_entities.extend(new_entities)
+                pending_rels.extend(new_rels)
+                pending_blocks.append(schema_block)
+                if len(pending_entities) >= batch_size:
+                    flush()
+        except Exception as e:
+            writer_errors.append(e)
+            # Keep draining until the sentinel: the queue is bounded, so
+            # exiting here would leave producers (and the finally-block
+            # sentinel put) blocked on a full queue instead of surfacing
+            # the recorded error.
+            while work_queue.get() is not None:
+                pass
+            return
+
+        # Final flush outside the drain-guarded try: the sentinel has
+        # already been consumed here, so a drain on failure would block
+        # forever on the empty queue — just record the error.
+        try:
+            flush()
+        except Exception as e:
+            writer_errors.append(e)
+
+    writer = threading.Thread(target=_writer, name="neo4j-writer")
+    writer.start()
+
+    def _enqueue(data):
+        results.append(data)
+
+        meta = data.get("meta", {})
+        diagram_path = meta.get("source", "unknown")
+        spec_id, diagram_id = derive_spec_id(meta.get("source", diagram_path), meta)
+
+        new_entities = [
+            row for row in build_entity_rows(data, spec_id, diagram_id)
+            if intern_row(row, ent_table) is row
+        ]
+        new_rels = [
+            row for row in build_relationship_rows(data, spec_id)
+            if intern_row(row, rel_table) is row
+        ]
+        schema_block = {
+            "spec_id": spec_id,
+            "diagram_id": diagram_id,
+            "title": meta.get("title", f"Schema Block: {spec_id}/{diagram_id}"),
+            "version": meta.get("version", "1.0"),
+            "artifact": meta.get("source", diagram_path),
+            "extractedAt": meta.get("extracted_at"),
+        }
+        work_queue.put((new_entities, new_rels, schema_block))
+
+    try:
+        for data in (batch_load_data(data_paths) if data_paths else []):
+            _enqueue(data)
+
+        # Content-hash caching skips the vision API for unchanged images
+        if cache_dir:
+            extract = extract_diagram_cached
+            extract_kwargs = dict(extract_kwargs, cache_dir=cache_dir)
+        else:
+            extract = extract_diagram
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(extract, image_path=p, **extract_kwargs): p
+                for p in image_paths
+            }
+            for future in as_completed(futures):
+                _enqueue(future.result())
+                if use_manifest:
+                    p = futures[future]
+                    st = os.stat(p)
+                    manifest[p] = {
+                        "mtime": st.st_mtime,
+                        "size": st.st_size,
+                        "extracted_json": str(diagram_cache_path(
+                            p,
+                            provider=extract_kwargs.get("provider", "openai"),
+                            model=extract_kwargs.get("model"),
+                            cache_dir=cache_dir,
+                        )),
+                    }
+
+        if use_manifest:
+            # Atomic rewrite so an interrupted run never corrupts the manifest
+            tmp_path = manifest_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_path, manifest_path)
+    finally:
+        work_queue.put(None)
+        writer.join()
+
+    if writer_errors:
+        raise writer_errors[0]
 
     return results
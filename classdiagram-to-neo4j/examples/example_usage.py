@@ -3,15 +3,21 @@
 Example usage of classdiagram-to-neo4j extraction and population.
 """
 
+import json
 import os
 from pathlib import Path
 
-# Add scripts to path
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Add the skill root to the path so the scripts package resolves
 import sys
-sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from extract_diagram import extract_diagram
-from populate_neo4j import populate_neo4j, load_data
+from scripts.extract_diagram import extract_diagram, existing_paths
+from scripts.populate_neo4j import populate_neo4j, load_data, intern_row
 
 
 def example_basic_extraction():
@@ -115,35 +121,69 @@ def example_batch_processing():
             "extracted_at": None
         }
     }
-    
-    for diagram_path in diagrams:
-        if not os.path.exists(diagram_path):
-            print(f"Skipping {diagram_path} (not found)")
-            continue
-        
-        print(f"Processing {diagram_path}...")
-        data = extract_diagram(
-            image_path=diagram_path,
-            provider="openai"
-        )
-        
-        # Merge entities
-        if "entities" in data:
-            all_data["entities"].update(data["entities"])
-        
-        # Merge relationships
-        if "relationships" in data:
-            all_data["relationships"].extend(data["relationships"])
-        
-        # Track sources
-        if "meta" in data and "source" in data["meta"]:
-            all_data["meta"]["sources"].append(data["meta"]["source"])
-    
-    # Save merged data
-    import json
-    with open("merged_extracted_data.json", "w") as f:
-        json.dump(all_data, f, indent=2)
-    
+
+    # Hash-consing tables so duplicate entities/relationships from
+    # overlapping diagrams are interned once instead of re-sent to Neo4j.
+    ent_table = {}
+    rel_table = {}
+
+    # Per-diagram entity dicts, merged in one pass after the loop so the
+    # final hash table is sized once instead of rehashing per update()
+    entities_list = []
+
+    # Stream entities/relationships to NDJSON sidecars as diagrams finish,
+    # so downstream consumers don't need the full merged dict in memory.
+    if orjson is not None:
+        dumps = orjson.dumps
+    else:
+        dumps = lambda obj: json.dumps(obj).encode()
+
+    # One scandir pass per directory instead of a stat() per diagram
+    found = existing_paths(diagrams)
+
+    with open("entities.ndjson", "wb") as ent_f, \
+         open("relationships.ndjson", "wb") as rel_f:
+        for diagram_path in diagrams:
+            if diagram_path not in found:
+                print(f"Skipping {diagram_path} (not found)")
+                continue
+
+            print(f"Processing {diagram_path}...")
+            data = extract_diagram(
+                image_path=diagram_path,
+                provider="openai"
+            )
+
+            # Collect entities (interned by content hash)
+            per_diagram = {}
+            for name, entity in data.get("entities", {}).items():
+                interned = intern_row(entity, ent_table)
+                per_diagram[name] = interned
+                if interned is entity:
+                    ent_f.write(dumps({"name": name, "entity": entity}) + b"\n")
+            entities_list.append(per_diagram)
+
+            # Merge relationships, dropping exact duplicates
+            for rel in data.get("relationships", []):
+                if intern_row(rel, rel_table) is rel:
+                    all_data["relationships"].append(rel)
+                    rel_f.write(dumps(rel) + b"\n")
+
+            # Track sources
+            if "meta" in data and "source" in data["meta"]:
+                all_data["meta"]["sources"].append(data["meta"]["source"])
+
+    # Merge all per-diagram entity dicts in a single comprehension
+    all_data["entities"] = {k: v for d in entities_list for k, v in d.items()}
+
+    # Save merged data (orjson indents in C; stdlib fallback otherwise)
+    if orjson is not None:
+        payload = orjson.dumps(all_data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(all_data, indent=2).encode()
+    with open("merged_extracted_data.json", "wb") as f:
+        f.write(payload)
+
     print(f"Merged {len(all_data['entities'])} entities")
     print(f"Merged {len(all_data['relationships'])} relationships")
     print("Merged data saved to merged_extracted_data.json")
@@ -0,0 +1 @@
+"""Extraction and Neo4j population scripts for classdiagram-to-neo4j."""
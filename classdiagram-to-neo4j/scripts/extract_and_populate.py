@@ -3,16 +3,28 @@
 Convenience script that combines extraction and Neo4j population in one step.
 """
 
+import json
 import os
-import sys
 from pathlib import Path
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent))
+try:
+    # Package import (cached immediately on re-import, no sys.path scan)
+    from .extract_diagram import extract_diagram, extract_diagram_cached
+    from .populate_neo4j import populate_neo4j, validate_extracted_data
+except ImportError:
+    # Fallback for direct script execution (python extract_and_populate.py)
+    from extract_diagram import extract_diagram, extract_diagram_cached
+    from populate_neo4j import populate_neo4j, validate_extracted_data
 
-from extract_diagram import extract_diagram
-from populate_neo4j import populate_neo4j, validate_extracted_data
+try:
+    from neo4j import GraphDatabase
+except ImportError:
+    GraphDatabase = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 def extract_and_populate(
     image_path: str,
@@ -24,7 +36,9 @@ def extract_and_populate(
     model: str = None,
     save_intermediate: bool = True,
     intermediate_path: str = None,
-    validate: bool = True
+    validate: bool = True,
+    cache_dir: str = ".diagram_cache",
+    driver=None
 ):
     """
     Extract diagram and populate Neo4j in one step.
@@ -39,6 +53,8 @@ def extract_and_populate(
         model: Model name (uses default if not provided)
         save_intermediate: Whether to save extracted data
         intermediate_path: Path to save intermediate data
+        cache_dir: Directory for cached extractions (None disables caching)
+        driver: Optional shared neo4j.Driver reused across invocations
     """
     # Get Neo4j settings from args or env
     neo4j_uri = neo4j_uri or os.getenv("NEO4J_URI", "bolt://localhost:7687")
@@ -52,23 +68,36 @@ def extract_and_populate(
     print(f"Extracting diagram: {image_path}")
     intermediate_path = intermediate_path or f"{Path(image_path).stem}_extracted.json"
     
-    data = extract_diagram(
-        image_path=image_path,
-        provider=provider,
-        output_format="json",
-        output_path=intermediate_path if save_intermediate else None,
-        model=model
-    )
-    
+    if cache_dir:
+        # Cached variant skips the vision API when the image is unchanged
+        data = extract_diagram_cached(
+            image_path=image_path,
+            provider=provider,
+            model=model,
+            cache_dir=cache_dir
+        )
+    else:
+        data = extract_diagram(
+            image_path=image_path,
+            provider=provider,
+            output_format="json",
+            model=model
+        )
+
     print(f"Extracted {len(data.get('entities', {}))} entities")
     print(f"Extracted {len(data.get('relationships', []))} relationships")
-    
+
     if save_intermediate:
+        if orjson is not None:
+            with open(intermediate_path, "wb") as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(intermediate_path, "w") as f:
+                json.dump(data, f, indent=2)
         print(f"Intermediate data saved to: {intermediate_path}")
     
     # Validate if requested
     if validate:
-        from populate_neo4j import validate_extracted_data
         errors = validate_extracted_data(data)
         if errors:
             print("Validation errors found:")
@@ -85,17 +114,18 @@ def extract_and_populate(
         neo4j_user=neo4j_user,
         neo4j_password=neo4j_password,
         neo4j_database=neo4j_database,
-        validate=validate
+        validate=validate,
+        driver=driver
     )
     
     print("Done!")
 
 
-if __name__ == "__main__":
+def main(argv=None):
     import argparse
-    
+
     parser = argparse.ArgumentParser(description="Extract diagram and populate Neo4j")
-    parser.add_argument("image_path", help="Path to diagram image")
+    parser.add_argument("image_path", nargs="?", help="Path to diagram image (omit with --batch)")
     parser.add_argument("--uri", help="Neo4j URI (defaults to NEO4J_URI env var)")
     parser.add_argument("--user", help="Neo4j username (defaults to NEO4J_USER env var)")
     parser.add_argument("--password", help="Neo4j password (defaults to NEO4J_PASSWORD env var)")
@@ -105,11 +135,12 @@ if __name__ == "__main__":
     parser.add_argument("--no-save", action="store_true", help="Don't save intermediate extracted data")
     parser.add_argument("--intermediate", help="Path to save intermediate extracted data")
     parser.add_argument("--no-validate", action="store_true", help="Skip data validation")
-    
-    args = parser.parse_args()
-    
-    extract_and_populate(
-        image_path=args.image_path,
+    parser.add_argument("--batch", action="store_true",
+                        help="Read image paths from stdin (one per line) and process them in one process")
+
+    args = parser.parse_args(argv)
+
+    common = dict(
         neo4j_uri=args.uri,
         neo4j_user=args.user,
         neo4j_password=args.password,
@@ -121,3 +152,33 @@ if __name__ == "__main__":
         validate=not args.no_validate
     )
 
+    if args.batch:
+        # One process, one shared driver: amortizes interpreter startup,
+        # module imports, and the Bolt handshake across all diagrams.
+        # Usage: find images -name '*.png' | python extract_and_populate.py --batch --password ...
+        import sys
+
+        driver = None
+        if GraphDatabase is not None:
+            uri = args.uri or os.getenv("NEO4J_URI", "bolt://localhost:7687")
+            user = args.user or os.getenv("NEO4J_USER", "neo4j")
+            password = args.password or os.getenv("NEO4J_PASSWORD")
+            if password:
+                driver = GraphDatabase.driver(uri, auth=(user, password))
+
+        try:
+            for line in sys.stdin:
+                image_path = line.strip()
+                if image_path:
+                    extract_and_populate(image_path=image_path, driver=driver, **common)
+        finally:
+            if driver is not None:
+                driver.close()
+    else:
+        if not args.image_path:
+            parser.error("image_path is required unless --batch is given")
+        extract_and_populate(image_path=args.image_path, **common)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,51 +6,99 @@ Uses scalable data model with stable labels and FQN-based identity.
 
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
 import re
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
-from datetime import datetime
+from datetime import datetime, timezone
+
+log = logging.getLogger(__name__)
 
 try:
-    from neo4j import GraphDatabase
+    from neo4j import GraphDatabase, unit_of_work
 except ImportError:
     GraphDatabase = None
+    unit_of_work = None
 
 try:
     import yaml
 except ImportError:
     yaml = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
 
 def load_data(file_path: str) -> Dict[str, Any]:
     """Load extracted data from JSON or YAML file."""
     path = Path(file_path)
-    
+
     if path.suffix.lower() == ".yaml" or path.suffix.lower() == ".yml":
         if yaml is None:
             raise ImportError("pyyaml package required. Install with: pip install pyyaml")
-        with open(file_path, "r") as f:
-            return yaml.safe_load(f)
+        # CSafeLoader parses in C when libyaml is present; same safe semantics
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        with open(file_path, "rb") as f:
+            return yaml.load(f, Loader=loader)
     else:
-        with open(file_path, "r") as f:
-            return json.load(f)
+        # One bytes read, parsed by orjson when available: skips the
+        # buffered-TextIO decode path and is measurably faster on big files
+        raw = path.read_bytes()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def batch_load_data(paths: List[str], max_workers: int = 16) -> List[Dict[str, Any]]:
+    """
+    Load many small JSON/YAML cache files with overlapped reads.
+
+    A batch of intermediate extraction files is dominated by per-file
+    syscall latency, so reads are submitted to a thread pool instead of
+    issued one blocking open()/read() at a time. JSON parsing uses
+    orjson when available.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def _read_one(path: str) -> Dict[str, Any]:
+        if Path(path).suffix.lower() in (".yaml", ".yml"):
+            return load_data(path)
+        with open(path, "rb") as f:
+            raw = f.read()
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+    if len(paths) <= 1:
+        return [_read_one(p) for p in paths]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+        return list(executor.map(_read_one, paths))
 
 
-# Valid cardinality patterns
-VALID_CARDINALITY_PATTERNS = {
-    "0..1", "0..*", "1", "1..*", "1..1", "*", 
+# Valid cardinality patterns (frozen: immutable constants the compiler
+# can treat as such, and nothing can mutate them from a hot path)
+VALID_CARDINALITY_PATTERNS = frozenset({
+    "0..1", "0..*", "1", "1..*", "1..1", "*",
     "0..0", "1..0", "0..n", "1..n", "n", "m..n"
-}
+})
 
 # Valid direction values
-VALID_DIRECTIONS = {"out", "in", "bidirectional"}
+VALID_DIRECTIONS = frozenset({"out", "in", "bidirectional"})
 
 # Valid relationship types (common patterns)
-VALID_RELATIONSHIP_TYPES = {
+VALID_RELATIONSHIP_TYPES = frozenset({
     "has", "belongs_to", "contains", "references", "relates_to",
     "inherits_from", "implements", "depends_on", "uses"
-}
+})
+
+# Allowed entity kinds (prevent label injection)
+ALLOWED_KINDS = frozenset({"Entity", "RefType", "SchemaBlock"})
 
 
 def validate_cardinality(card: Optional[str], field_name: str) -> Optional[str]:
@@ -65,18 +113,22 @@ def validate_cardinality(card: Optional[str], field_name: str) -> Optional[str]:
     if card in VALID_CARDINALITY_PATTERNS:
         return None
     
-    # Check pattern matches (e.g., "0..5", "1..10")
-    if re.match(r'^\d+\.\.\d+$', card):
-        return None
-    
-    if re.match(r'^\d+\.\.\*$', card):
+    # Check numeric ranges (e.g., "0..5", "1..10", "2..*") with plain
+    # string ops: cheaper than a regex walk on this per-relationship path
+    left, sep, right = card.partition("..")
+    if sep == ".." and left.isdigit() and (right == "*" or right.isdigit()):
         return None
     
     return f"{field_name} has invalid cardinality format '{card}'"
 
 
-def validate_extracted_data(data: Dict[str, Any]) -> List[str]:
-    """Validate extracted data structure and return list of errors."""
+def _validate_extracted_data_py(data: Dict[str, Any]) -> List[str]:
+    """Hand-written validation walk (fallback when fastjsonschema is absent)."""
+    # Local bindings: LOAD_FAST in the loops instead of LOAD_GLOBAL
+    allowed_kinds = ALLOWED_KINDS
+    valid_directions = VALID_DIRECTIONS
+    valid_rel_types = VALID_RELATIONSHIP_TYPES
+
     errors = []
     entity_names = set()
     
@@ -102,8 +154,8 @@ def validate_extracted_data(data: Dict[str, Any]) -> List[str]:
             # Validate kind if present
             if "kind" in entity_data:
                 kind = entity_data["kind"]
-                if kind not in ALLOWED_KINDS:
-                    errors.append(f"Entity '{entity_name}' has invalid kind '{kind}' (must be one of {ALLOWED_KINDS})")
+                if kind not in allowed_kinds:
+                    errors.append(f"Entity '{entity_name}' has invalid kind '{kind}' (must be one of {set(allowed_kinds)})")
             
             if "properties" in entity_data:
                 if not isinstance(entity_data["properties"], list):
@@ -158,8 +210,8 @@ def validate_extracted_data(data: Dict[str, Any]) -> List[str]:
             # Validate direction
             if "direction" in rel:
                 direction = rel["direction"]
-                if direction not in VALID_DIRECTIONS:
-                    errors.append(f"Relationship[{i}] has invalid direction '{direction}' (must be one of {VALID_DIRECTIONS})")
+                if direction not in valid_directions:
+                    errors.append(f"Relationship[{i}] has invalid direction '{direction}' (must be one of {set(valid_directions)})")
             
             # Validate type (if present)
             if "type" in rel and rel["type"]:
@@ -167,22 +219,106 @@ def validate_extracted_data(data: Dict[str, Any]) -> List[str]:
                 if not isinstance(rel_type, str):
                     errors.append(f"Relationship[{i}] 'type' must be a string")
                 # Note: We don't enforce exact match, but warn about unusual patterns
-                if not any(rel_type.startswith(prefix) for prefix in VALID_RELATIONSHIP_TYPES):
+                if not any(rel_type.startswith(prefix) for prefix in valid_rel_types):
                     # Just a warning, not an error
                     pass
     
     return errors
 
 
+# JSON Schema for the extracted-data shape. fastjsonschema compiles it to
+# straight-line Python once at import, replacing the per-item isinstance/
+# f-string walk on the success path; referential checks (relationship
+# endpoints, cardinality formats) stay in Python since JSON Schema cannot
+# express them.
+EXTRACTED_DATA_SCHEMA = {
+    "type": "object",
+    "required": ["entities", "relationships"],
+    "properties": {
+        "entities": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "properties": {
+                    "label": {"type": "string"},
+                    "kind": {"enum": ["Entity", "RefType", "SchemaBlock"]},
+                    "properties": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "required": ["name"],
+                            "properties": {
+                                "name": {"type": "string"},
+                                "type": {"type": "string"},
+                                "required": {"type": "boolean"}
+                            }
+                        }
+                    }
+                }
+            }
+        },
+        "relationships": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["from", "to"],
+                "properties": {
+                    "from": {"type": "string"},
+                    "to": {"type": "string"},
+                    "type": {"type": "string"},
+                    "fromCardinality": {"type": ["string", "null"]},
+                    "toCardinality": {"type": ["string", "null"]},
+                    "cardinality": {"type": ["string", "null"]},
+                    "direction": {"enum": ["out", "in", "bidirectional"]}
+                }
+            }
+        },
+        "meta": {"type": "object"}
+    }
+}
+
+if fastjsonschema is not None:
+    _VALIDATE = fastjsonschema.compile(EXTRACTED_DATA_SCHEMA)
+else:
+    _VALIDATE = None
+
+
+def _referential_errors(data: Dict[str, Any]) -> List[str]:
+    """Check relationship endpoints and cardinality formats (schema-validated input)."""
+    errors = []
+    entity_names = data.get("entities", {}).keys()
+
+    for i, rel in enumerate(data.get("relationships", [])):
+        if rel["from"] not in entity_names:
+            errors.append(f"Relationship[{i}] 'from' entity '{rel['from']}' not found in entities")
+        if rel["to"] not in entity_names:
+            errors.append(f"Relationship[{i}] 'to' entity '{rel['to']}' not found in entities")
+
+        for key in ("fromCardinality", "toCardinality", "cardinality"):
+            if key in rel:
+                card_error = validate_cardinality(rel[key], f"Relationship[{i}].{key}")
+                if card_error:
+                    errors.append(card_error)
+
+    return errors
+
+
+def validate_extracted_data(data: Dict[str, Any]) -> List[str]:
+    """Validate extracted data structure and return list of errors."""
+    if _VALIDATE is not None:
+        try:
+            _VALIDATE(data)
+        except fastjsonschema.JsonSchemaException as e:
+            return [str(e)]
+        return _referential_errors(data)
+    return _validate_extracted_data_py(data)
+
+
 def generate_fqn(spec_id: str, entity_name: str) -> str:
     """Generate fully qualified name for entity."""
     return f"{spec_id}#{entity_name}"
 
 
-# Allowed entity kinds (prevent label injection)
-ALLOWED_KINDS = {"Entity", "RefType", "SchemaBlock"}
-
-
 def determine_entity_kind(entity_name: str, entity_data: Dict[str, Any]) -> str:
     """Determine entity kind (Entity, RefType) with allowlist validation."""
     # Check if it's a reference type
@@ -195,75 +331,84 @@ def determine_entity_kind(entity_name: str, entity_data: Dict[str, Any]) -> str:
         if kind in ALLOWED_KINDS:
             return kind
         # If kind is not in allowlist, log warning and default to Entity
-        print(f"Warning: Unknown kind '{kind}' for entity '{entity_name}', defaulting to 'Entity'")
+        log.warning("Unknown kind '%s' for entity '%s', defaulting to 'Entity'", kind, entity_name)
     
     # Default to Entity
     return "Entity"
 
 
-def create_stable_constraints(driver, database: str = "neo4j") -> None:
-    """Create constraints for stable labels."""
-    with driver.session(database=database) as session:
-        constraints = [
-            "CREATE CONSTRAINT entity_fqn IF NOT EXISTS FOR (e:Entity) REQUIRE e.fqn IS UNIQUE;",
-            "CREATE CONSTRAINT reftype_fqn IF NOT EXISTS FOR (r:RefType) REQUIRE r.fqn IS UNIQUE;",
-            "CREATE CONSTRAINT schema_block_id IF NOT EXISTS FOR (s:SchemaBlock) REQUIRE s.id IS UNIQUE;",
-            "CREATE CONSTRAINT field_fqn IF NOT EXISTS FOR (f:Field) REQUIRE f.fqn IS UNIQUE;",
-        ]
-        
-        for constraint_query in constraints:
-            try:
-                session.run(constraint_query)
-            except Exception as e:
-                print(f"Note: Could not create constraint: {e}")
-
-
-def create_stable_indexes(driver, database: str = "neo4j", check_server_version: bool = True) -> None:
-    """Create indexes for stable labels (correct Neo4j syntax)."""
-    with driver.session(database=database) as session:
-        # Node property indexes (work on all Neo4j versions)
-        node_indexes = [
-            "CREATE INDEX entity_name IF NOT EXISTS FOR (e:Entity) ON (e.name);",
-            "CREATE INDEX entity_spec_id IF NOT EXISTS FOR (e:Entity) ON (e.specId);",
-            "CREATE INDEX reftype_name IF NOT EXISTS FOR (r:RefType) ON (r.name);",
-            "CREATE INDEX field_name IF NOT EXISTS FOR (f:Field) ON (f.name);",
-        ]
-        
-        for index_query in node_indexes:
-            try:
-                session.run(index_query)
-            except Exception as e:
-                print(f"Note: Could not create index: {e}")
-        
-        # Relationship property indexes (require Neo4j 4.3+)
-        rel_indexes = [
-            "CREATE INDEX relationship_type IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.type);",
-            "CREATE INDEX relationship_cardinality IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.cardinality);",
-        ]
-        
-        if check_server_version:
-            # Try to check server version
-            try:
-                result = session.run("CALL dbms.components() YIELD name, versions RETURN versions[0] as version")
-                version_str = result.single()["version"]
-                version_parts = version_str.split(".")
-                major = int(version_parts[0])
-                minor = int(version_parts[1]) if len(version_parts) > 1 else 0
-                
-                if major < 4 or (major == 4 and minor < 3):
-                    print(f"Warning: Neo4j server version {version_str} does not support relationship property indexes (requires 4.3+). Skipping relationship indexes.")
-                    print("See NEO4J_REQUIREMENTS.md for details.")
-                    return
-            except Exception:
-                # If version check fails, try creating indexes anyway
-                pass
-        
-        for index_query in rel_indexes:
-            try:
-                session.run(index_query)
-            except Exception as e:
-                print(f"Note: Could not create relationship property index (may require Neo4j 4.3+): {e}")
-                print("See NEO4J_REQUIREMENTS.md for version compatibility details.")
+def create_stable_constraints(session) -> None:
+    """Create constraints for stable labels on an already-open session."""
+    constraints = [
+        "CREATE CONSTRAINT entity_fqn IF NOT EXISTS FOR (e:Entity) REQUIRE e.fqn IS UNIQUE;",
+        "CREATE CONSTRAINT reftype_fqn IF NOT EXISTS FOR (r:RefType) REQUIRE r.fqn IS UNIQUE;",
+        "CREATE CONSTRAINT schema_block_id IF NOT EXISTS FOR (s:SchemaBlock) REQUIRE s.id IS UNIQUE;",
+        "CREATE CONSTRAINT field_fqn IF NOT EXISTS FOR (f:Field) REQUIRE f.fqn IS UNIQUE;",
+    ]
+
+    for constraint_query in constraints:
+        try:
+            # consume() releases the result stream immediately instead of
+            # leaving the server buffering an unused result
+            session.run(constraint_query).consume()
+        except Exception as e:
+            log.warning("Could not create constraint: %s", e)
+
+
+def create_stable_indexes(session, check_server_version: bool = True) -> None:
+    """Create indexes for stable labels on an already-open session."""
+    # Node property indexes (work on all Neo4j versions)
+    node_indexes = [
+        "CREATE INDEX entity_name IF NOT EXISTS FOR (e:Entity) ON (e.name);",
+        "CREATE INDEX entity_spec_id IF NOT EXISTS FOR (e:Entity) ON (e.specId);",
+        "CREATE INDEX reftype_name IF NOT EXISTS FOR (r:RefType) ON (r.name);",
+        "CREATE INDEX field_name IF NOT EXISTS FOR (f:Field) ON (f.name);",
+    ]
+
+    for index_query in node_indexes:
+        try:
+            session.run(index_query).consume()
+        except Exception as e:
+            log.warning("Could not create index: %s", e)
+
+    # Relationship property indexes (require Neo4j 4.3+)
+    rel_indexes = [
+        "CREATE INDEX relationship_type IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.type);",
+        "CREATE INDEX relationship_cardinality IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.cardinality);",
+    ]
+
+    if check_server_version:
+        # Try to check server version
+        try:
+            result = session.run("CALL dbms.components() YIELD name, versions RETURN versions[0] as version")
+            version_str = result.single()["version"]
+            version_parts = version_str.split(".")
+            major = int(version_parts[0])
+            minor = int(version_parts[1]) if len(version_parts) > 1 else 0
+
+            if major < 4 or (major == 4 and minor < 3):
+                log.warning(
+                    "Neo4j server version %s does not support relationship property indexes "
+                    "(requires 4.3+). Skipping relationship indexes. See NEO4J_REQUIREMENTS.md.",
+                    version_str
+                )
+                return
+        except Exception:
+            # If version check fails, try creating indexes anyway
+            pass
+
+    for index_query in rel_indexes:
+        try:
+            session.run(index_query).consume()
+        except Exception as e:
+            log.warning(
+                "Could not create relationship property index (may require Neo4j 4.3+): %s. "
+                "See NEO4J_REQUIREMENTS.md for version compatibility details.", e
+            )
+
+
+# Spec-ID prefixes checked with one tuple-argument startswith call
+_SPEC_PREFIXES = ("tmf", "spec")
 
 
 def derive_spec_id(source_path: str, meta: Dict[str, Any]) -> Tuple[str, str]:
@@ -278,21 +423,22 @@ def derive_spec_id(source_path: str, meta: Dict[str, Any]) -> Tuple[str, str]:
         - "tmf620/productoffering.png" -> ("tmf620", "productoffering")
         - "diagrams/tmf620_productoffering.png" -> ("tmf620", "productoffering")
     """
+    path = Path(source_path)
+
     # Check metadata first
     if "specId" in meta:
         spec_id = meta["specId"]
-        diagram_id = meta.get("diagramId") or Path(source_path).stem
+        diagram_id = meta.get("diagramId") or path.stem
         return (spec_id, diagram_id)
-    
+
     # Try to extract from path structure
-    path = Path(source_path)
     parts = path.parts
     
     # Look for patterns like "tmf620/page_034.png" or "tmf620/productoffering.png"
     if len(parts) >= 2:
         # Check if parent directory looks like a spec ID (e.g., "tmf620")
         parent = parts[-2]
-        if parent.startswith("tmf") or parent.startswith("spec"):
+        if parent.startswith(_SPEC_PREFIXES):
             spec_id = parent
             diagram_id = path.stem
             return (spec_id, diagram_id)
@@ -301,7 +447,7 @@ def derive_spec_id(source_path: str, meta: Dict[str, Any]) -> Tuple[str, str]:
     stem = path.stem
     if "_" in stem:
         parts = stem.split("_", 1)
-        if parts[0].startswith("tmf") or parts[0].startswith("spec"):
+        if parts[0].startswith(_SPEC_PREFIXES):
             spec_id = parts[0]
             diagram_id = parts[1] if len(parts) > 1 else stem
             return (spec_id, diagram_id)
@@ -316,38 +462,46 @@ def derive_spec_id(source_path: str, meta: Dict[str, Any]) -> Tuple[str, str]:
     return (spec_id, diagram_id)
 
 
-def create_schema_block(driver, data: Dict[str, Any], database: str = "neo4j") -> Tuple[str, str]:
-    """Create SchemaBlock node and return (spec_id, diagram_id)."""
+def _utc_timestamp() -> str:
+    """Current UTC time as an ISO-8601 Z string (utcnow() is deprecated)."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def create_schema_block(
+    session,
+    data: Dict[str, Any],
+    extracted_at_fallback: Optional[str] = None
+) -> Tuple[str, str]:
+    """Create SchemaBlock node on an open session; return (spec_id, diagram_id)."""
     meta = data.get("meta", {})
     source = meta.get("source", "unknown")
-    
+
     spec_id, diagram_id = derive_spec_id(source, meta)
-    
-    with driver.session(database=database) as session:
-        # Use diagram_id as the unique SchemaBlock ID (one per diagram)
-        query = """
-        MERGE (sb:SchemaBlock {id: $diagram_id})
-        SET sb.specId = $spec_id,
-            sb.diagramId = $diagram_id,
-            sb.title = $title,
-            sb.version = $version,
-            sb.artifact = $artifact,
-            sb.extractedAt = $extractedAt
-        RETURN sb.specId as spec_id, sb.diagramId as diagram_id
-        """
-        
-        result = session.run(
-            query,
-            spec_id=spec_id,
-            diagram_id=diagram_id,
-            title=meta.get("title", f"Schema Block: {spec_id}/{diagram_id}"),
-            version=meta.get("version", "1.0"),
-            artifact=meta.get("source", source),
-            extractedAt=meta.get("extracted_at", datetime.utcnow().isoformat() + "Z")
-        )
-        
-        row = result.single()
-        return (row["spec_id"], row["diagram_id"])
+
+    # Use diagram_id as the unique SchemaBlock ID (one per diagram)
+    query = """
+    MERGE (sb:SchemaBlock {id: $diagram_id})
+    SET sb.specId = $spec_id,
+        sb.diagramId = $diagram_id,
+        sb.title = $title,
+        sb.version = $version,
+        sb.artifact = $artifact,
+        sb.extractedAt = $extractedAt
+    RETURN sb.specId as spec_id, sb.diagramId as diagram_id
+    """
+
+    result = session.run(
+        query,
+        spec_id=spec_id,
+        diagram_id=diagram_id,
+        title=meta.get("title", f"Schema Block: {spec_id}/{diagram_id}"),
+        version=meta.get("version", "1.0"),
+        artifact=meta.get("source", source),
+        extractedAt=meta.get("extracted_at") or extracted_at_fallback or _utc_timestamp()
+    )
+
+    row = result.single()
+    return (row["spec_id"], row["diagram_id"])
 
 
 # Note: create_entity, create_field, and create_relationship are now replaced
@@ -355,6 +509,380 @@ def create_schema_block(driver, data: Dict[str, Any], database: str = "neo4j") -
 # These functions are kept for backward compatibility but not used in the main flow.
 
 
+# Bulk UNWIND queries shared by populate_neo4j() and populate_neo4j_bulk().
+# Labels cannot be parameterized in Cypher, so the entity query is a template
+# formatted with a kind from ALLOWED_KINDS (never user input).
+ENTITY_BULK_QUERY_TEMPLATE = """
+UNWIND $entities AS ent
+MERGE (e:{label} {{fqn: ent.fqn}})
+SET e.name = ent.entity_name,
+    e.label = ent.label,
+    e.specId = ent.spec_id,
+    e.kind = '{label}'
+FOREACH (f IN ent.fields |
+  MERGE (field:Field {{fqn: f.fqn}})
+  SET field += f.props
+  MERGE (e)-[:HAS_FIELD]->(field)
+)
+FOREACH (d IN ent.diagram_ids |
+  MERGE (sb:SchemaBlock {{id: d}})
+  MERGE (sb)-[:CONTAINS_ENTITY]->(e)
+)
+"""
+
+# Labels cannot be parameterized, so directed relationship rows are
+# bucketed by (from_kind, to_kind) client-side and the template formatted
+# per bucket; the label hints let the planner seek the fqn
+# unique-constraint indexes instead of scanning all nodes. Direction
+# handling happens client-side too (_directed_relationship_rows), so the
+# query is a branch-free MERGE the plan cache can reuse.
+RELATIONSHIP_BULK_QUERY_TEMPLATE = """
+UNWIND $relationships AS rel
+MATCH (from:{from_label} {{fqn: rel.from_fqn}})
+MATCH (to:{to_label} {{fqn: rel.to_fqn}})
+MERGE (from)-[r:RELATES_TO]->(to)
+SET r += rel.props
+"""
+
+# CONTAINS_ENTITY edges are merged in the entity bulk query from each
+# entity's own diagram_id, so this only upserts block properties; the old
+# spec-wide `MATCH (e) WHERE e.specId = ...` relinked every entity the
+# spec ever had (label-less, and touching nodes from unrelated runs).
+SCHEMA_BLOCK_BULK_QUERY = """
+UNWIND $blocks AS b
+MERGE (sb:SchemaBlock {id: b.diagram_id})
+SET sb.specId = b.spec_id,
+    sb.diagramId = b.diagram_id,
+    sb.title = b.title,
+    sb.version = b.version,
+    sb.artifact = b.artifact,
+    sb.extractedAt = b.extractedAt
+"""
+
+
+def _chunked(rows: List[Any], size: int):
+    """Yield chunks of at most `size` rows, one transaction's worth at a time."""
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def intern_row(obj: Any, table: Dict[bytes, Any]) -> Any:
+    """
+    Hash-cons a JSON-serializable row: return the canonical copy keyed by
+    a stable content hash, so callers can drop duplicates before sending
+    rows to Neo4j (the interned object is `obj` itself on first sight).
+    """
+    h = hashlib.blake2b(
+        json.dumps(obj, sort_keys=True, default=str).encode(),
+        digest_size=16
+    ).digest()
+    return table.setdefault(h, obj)
+
+
+def _field_rows(entity_data: Dict[str, Any], entity_fqn: str) -> List[Dict[str, Any]]:
+    """
+    Flatten an entity's properties into UNWIND-ready field rows. None
+    values (description/default are often absent) are stripped so Bolt
+    never ships Null markers and the server never stores Null properties.
+    """
+    rows = []
+    seen = set()
+    for f in entity_data.get("properties", []):
+        name = f.get("name", "")
+        if name in seen:
+            continue
+        seen.add(name)
+        props = {
+            "name": name,
+            "type": f.get("type", "string"),
+            "required": f.get("required", False),
+            "entityFqn": entity_fqn
+        }
+        if f.get("description") is not None:
+            props["description"] = f["description"]
+        if f.get("default") is not None:
+            props["defaultValue"] = f["default"]
+        rows.append({"fqn": f"{entity_fqn}.{name}", "props": props})
+    return rows
+
+
+def _entity_row(
+    name: str,
+    entity_data: Dict[str, Any],
+    spec_id: str,
+    diagram_id: Optional[str]
+) -> Dict[str, Any]:
+    """Build one UNWIND-ready entity row with fqn/label/kind precomputed.
+
+    Only wire-relevant keys go into the row: the raw entity dict is
+    consumed here (kind, label, fields) and never sent over Bolt, where
+    it would dwarf the useful payload.
+    """
+    fqn = generate_fqn(spec_id, name)
+    return {
+        "entity_name": name,
+        "kind": determine_entity_kind(name, entity_data),
+        "spec_id": spec_id,
+        "diagram_ids": [diagram_id] if diagram_id else [],
+        "fqn": fqn,
+        "label": entity_data.get("label") or name,
+        "fields": _field_rows(entity_data, fqn)
+    }
+
+
+def build_entity_rows(
+    data: Dict[str, Any],
+    spec_id: str,
+    diagram_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Build UNWIND-ready entity rows (fields inlined) from one diagram."""
+    return [
+        _entity_row(name, entity_data, spec_id, diagram_id)
+        for name, entity_data in data.get("entities", {}).items()
+    ]
+
+
+def build_relationship_rows(data: Dict[str, Any], spec_id: str) -> List[Dict[str, Any]]:
+    """Build UNWIND-ready relationship rows from one diagram's extracted data."""
+    entities = data.get("entities", {})
+    kinds = {
+        name: determine_entity_kind(name, entity_data)
+        for name, entity_data in entities.items()
+    }
+    rows = []
+    for rel in data.get("relationships", []):
+        from_entity = rel.get("from")
+        to_entity = rel.get("to")
+        if from_entity in kinds and to_entity in kinds:
+            rows.append({
+                "from_fqn": generate_fqn(spec_id, from_entity),
+                "to_fqn": generate_fqn(spec_id, to_entity),
+                "from_kind": kinds[from_entity],
+                "to_kind": kinds[to_entity],
+                "rel_type": rel.get("type", "relates_to"),
+                "from_cardinality": rel.get("fromCardinality") or rel.get("cardinality"),
+                "to_cardinality": rel.get("toCardinality") or rel.get("cardinality"),
+                "direction": rel.get("direction", "out"),
+                "role": rel.get("role"),
+                "name": rel.get("name"),
+                "relationship_type": rel.get("relationshipType"),
+                "order": rel.get("order"),
+                "is_containment": rel.get("isContainment", False),
+                "is_inheritance": rel.get("isInheritance", False),
+                "is_dashed": rel.get("isDashed", False)
+            })
+    return rows
+
+
+def _directed_relationship_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Expand relationship rows into directed MERGE rows with a precomputed
+    props map: 'out' rows pass through, 'in' rows swap endpoints and
+    cardinalities, 'bidirectional' rows produce both. This keeps the
+    Cypher side a plain MERGE with no CASE/FOREACH branching. Duplicate
+    (from, to, type, direction) rows are dropped: they would hit the same
+    MERGE and pay its lock and read cost for no new data.
+    """
+    directed = []
+    seen = set()
+    for row in rows:
+        candidate = {
+            "type": row.get("rel_type"),
+            "direction": "out",
+            "fromCardinality": row.get("from_cardinality"),
+            "toCardinality": row.get("to_cardinality"),
+            "role": row.get("role"),
+            "name": row.get("name"),
+            "relationshipType": row.get("relationship_type"),
+            "order": row.get("order"),
+            "isContainment": row.get("is_containment", False),
+            "isInheritance": row.get("is_inheritance", False),
+            "isDashed": row.get("is_dashed", False)
+        }
+        # Omit None-valued keys: Bolt would serialize each as a Null
+        # marker and the server would store Null properties
+        props = {k: v for k, v in candidate.items() if v is not None}
+        direction = row.get("direction", "out")
+        key = (row["from_fqn"], row["to_fqn"], row.get("rel_type"), direction)
+        if key in seen:
+            continue
+        seen.add(key)
+        if direction != "in":
+            directed.append({
+                "from_fqn": row["from_fqn"],
+                "to_fqn": row["to_fqn"],
+                "from_kind": row.get("from_kind", "Entity"),
+                "to_kind": row.get("to_kind", "Entity"),
+                "props": props
+            })
+        if direction in ("in", "bidirectional"):
+            directed.append({
+                "from_fqn": row["to_fqn"],
+                "to_fqn": row["from_fqn"],
+                "from_kind": row.get("to_kind", "Entity"),
+                "to_kind": row.get("from_kind", "Entity"),
+                "props": {
+                    k: v for k, v in dict(
+                        props,
+                        direction="in",
+                        fromCardinality=props.get("toCardinality"),
+                        toCardinality=props.get("fromCardinality")
+                    ).items() if v is not None
+                }
+            })
+    return directed
+
+
+def _bucket_relationships(
+    rows: List[Dict[str, Any]]
+) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+    """Group relationship rows by endpoint kinds for label-hinted MATCHes."""
+    buckets: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for row in rows:
+        key = (row.get("from_kind", "Entity"), row.get("to_kind", "Entity"))
+        buckets.setdefault(key, []).append(row)
+    return buckets
+
+
+def _exec_chunk(driver, database, query, param, chunk, deferred=False):
+    """Run one UNWIND chunk in its own session checked out of the pool."""
+    with driver.session(database=database) as session:
+        def work(tx):
+            # Write-only: consume() frees the server-side result buffer
+            # immediately so the commit is not held behind an open stream
+            tx.run(query, **{param: chunk}).consume()
+        if deferred and unit_of_work is not None:
+            work = unit_of_work(metadata={"deferred": True})(work)
+        return session.execute_write(work)
+
+
+def populate_neo4j_bulk(
+    driver,
+    entity_rows: List[Dict[str, Any]],
+    relationship_rows: List[Dict[str, Any]],
+    schema_blocks: Optional[List[Dict[str, Any]]] = None,
+    database: str = "neo4j",
+    batch_size: int = 10000,
+    create_constraints_flag: bool = True,
+    create_indexes_flag: bool = True,
+    deferred: bool = False,
+    max_workers: int = 4
+) -> None:
+    """
+    Bulk-populate Neo4j from pre-merged entity and relationship rows.
+
+    Unlike populate_neo4j(), this takes an already-open driver so one
+    connection pool can serve a whole batch of diagrams, and pushes rows
+    via chunked UNWIND queries (one query per label/type per chunk)
+    instead of per-diagram round-trips. Each entity chunk writes the
+    entity, its fields, and its CONTAINS_ENTITY link in one query;
+    Entity and RefType chunks run in parallel across pooled connections,
+    with a barrier before relationships so their MATCHes see every node.
+
+    Args:
+        driver: An open neo4j.Driver (caller owns its lifetime)
+        entity_rows: Rows from build_entity_rows() across all diagrams
+        relationship_rows: Rows from build_relationship_rows() across all diagrams
+        schema_blocks: Optional SchemaBlock rows (spec_id, diagram_id, title, ...)
+        database: Neo4j database name
+        batch_size: Rows per UNWIND transaction
+        create_constraints_flag: Whether to create constraints first
+        create_indexes_flag: Whether to create indexes first
+        deferred: Tag transactions as deferred (relaxed durability for
+            non-critical ingests) and skip per-call commit-sync waits
+        max_workers: Concurrent write transactions for independent phases
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    if create_constraints_flag or create_indexes_flag:
+        with driver.session(database=database) as session:
+            if create_constraints_flag:
+                create_stable_constraints(session)
+            if create_indexes_flag:
+                create_stable_indexes(session, check_server_version=True)
+
+    # Separate entities by kind for correct label assignment, keeping one
+    # row per fqn (last wins, with the diagram ids of every duplicate
+    # folded into the survivor): parallel chunks must never MERGE the
+    # same constrained node, or the losing transaction fails with a
+    # ConstraintValidationFailed that execute_write does not retry — and
+    # an entity shared by several diagrams still owes each of their
+    # SchemaBlocks its CONTAINS_ENTITY edge.
+    by_kind_fqn: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for row in entity_rows:
+        bucket = by_kind_fqn.setdefault(row["kind"], {})
+        existing = bucket.get(row["fqn"])
+        if existing is not None:
+            prior_ids = existing["diagram_ids"]
+            if prior_ids != row["diagram_ids"]:
+                # Copy rather than mutate: rows may be interned and
+                # shared across flushes by callers
+                row = dict(row)
+                row["diagram_ids"] = list(dict.fromkeys(
+                    prior_ids + row["diagram_ids"]
+                ))
+        bucket[row["fqn"]] = row
+    rows_by_kind: Dict[str, List[Dict[str, Any]]] = {
+        kind: list(rows.values()) for kind, rows in by_kind_fqn.items()
+    }
+
+    # Same race on SchemaBlocks: rows from one diagram can straddle chunk
+    # boundaries, so every referenced block is pre-created serially and
+    # the per-chunk MERGE then only matches existing nodes.
+    diagram_ids = sorted({
+        d for row in entity_rows for d in row["diagram_ids"]
+    })
+    if diagram_ids:
+        with driver.session(database=database) as session:
+            session.execute_write(
+                lambda tx: tx.run(
+                    "UNWIND $ids AS id MERGE (:SchemaBlock {id: id})",
+                    ids=diagram_ids
+                ).consume()
+            )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for kind, rows in rows_by_kind.items():
+            query = ENTITY_BULK_QUERY_TEMPLATE.format(label=kind)
+            for batch in _chunked(rows, batch_size):
+                futures.append(executor.submit(
+                    _exec_chunk, driver, database, query, "entities", batch, deferred
+                ))
+
+        # Barrier: relationships MATCH the nodes written above
+        for future in as_completed(futures):
+            future.result()
+
+    for kind, rows in rows_by_kind.items():
+        log.info("created %d %s nodes (fields inlined)", len(rows), kind)
+
+    # Relationship MERGEs lock their endpoint nodes, so running them in
+    # parallel risks deadlocks; keep this phase on one session.
+    with driver.session(database=database) as session:
+        def _bulk_write(query, param, rows):
+            def work(tx):
+                tx.run(query, **{param: rows}).consume()
+            if deferred and unit_of_work is not None:
+                work = unit_of_work(metadata={"deferred": True})(work)
+            return session.execute_write(work)
+
+        directed_rows = _directed_relationship_rows(relationship_rows)
+        for (from_kind, to_kind), bucket in _bucket_relationships(directed_rows).items():
+            query = RELATIONSHIP_BULK_QUERY_TEMPLATE.format(
+                from_label=from_kind, to_label=to_kind
+            )
+            for batch in _chunked(bucket, batch_size):
+                _bulk_write(query, "relationships", batch)
+        if relationship_rows:
+            log.info("created %d relationships", len(relationship_rows))
+
+        if schema_blocks:
+            for batch in _chunked(schema_blocks, batch_size):
+                _bulk_write(SCHEMA_BLOCK_BULK_QUERY, "blocks", batch)
+            log.info("created %d schema blocks", len(schema_blocks))
+
+
 def populate_neo4j(
     data: Dict[str, Any],
     neo4j_uri: str,
@@ -363,11 +891,15 @@ def populate_neo4j(
     neo4j_database: str = "neo4j",
     create_constraints_flag: bool = True,
     create_indexes_flag: bool = True,
-    validate: bool = True
+    validate: bool = True,
+    driver=None,
+    batch_size: int = 10000,
+    max_connection_pool_size: int = 50,
+    connection_acquisition_timeout: float = 60.0
 ) -> None:
     """
     Populate Neo4j database from extracted diagram data.
-    
+
     Args:
         data: Extracted diagram data dictionary
         neo4j_uri: Neo4j connection URI (e.g., "bolt://localhost:7687")
@@ -377,216 +909,154 @@ def populate_neo4j(
         create_constraints_flag: Whether to create constraints
         create_indexes_flag: Whether to create indexes
         validate: Whether to validate data before populating
+        driver: Optional already-open neo4j.Driver; when provided the
+            caller owns its lifetime and no new connection is opened
+        batch_size: Rows per UNWIND transaction
+        max_connection_pool_size: Bolt connection pool size when this call
+            opens its own driver
+        connection_acquisition_timeout: Seconds to wait for a pooled
+            connection before failing
     """
     if GraphDatabase is None:
         raise ImportError("neo4j package required. Install with: pip install neo4j")
-    
+
     # Validate data if requested
     if validate:
         errors = validate_extracted_data(data)
         if errors:
             raise ValueError(f"Data validation failed:\n" + "\n".join(f"  - {e}" for e in errors))
-    
-    driver = GraphDatabase.driver(neo4j_uri, auth=(neo4j_user, neo4j_password))
-    
+
+    run_started_at = _utc_timestamp()
+
+    owns_driver = driver is None
+    if owns_driver:
+        # Explicit pool settings: defaults bottleneck under parallel bulk
+        # writes, and keep-alive avoids re-paying the Bolt handshake when
+        # the pool sits idle between phases
+        driver = GraphDatabase.driver(
+            neo4j_uri,
+            auth=(neo4j_user, neo4j_password),
+            max_connection_pool_size=max_connection_pool_size,
+            connection_acquisition_timeout=connection_acquisition_timeout,
+            max_connection_lifetime=3600,
+            keep_alive=True,
+            connection_timeout=15.0
+        )
+
     try:
-        # Create constraints and indexes
-        if create_constraints_flag:
-            create_stable_constraints(driver, neo4j_database)
-        
-        if create_indexes_flag:
-            create_stable_indexes(driver, neo4j_database, check_server_version=True)
-        
-        # Create schema block
-        spec_id, diagram_id = create_schema_block(driver, data, neo4j_database)
-        print(f"Created schema block: {spec_id}/{diagram_id}")
-        
-        # Track FQNs for relationship creation
-        entity_fqns = {}
-        
-        # Bulk create entities using UNWIND (performance optimization)
-        if "entities" in data:
-            # Separate entities by kind for correct label assignment
-            entity_items = []
-            reftype_items = []
-            
-            for name, entity_data in data["entities"].items():
-                item = {
-                    "entity_name": name,
-                    "entity_data": entity_data,
-                    "spec_id": spec_id
-                }
-                
-                # Determine kind with allowlist validation
-                kind = determine_entity_kind(name, entity_data)
-                if kind == "RefType":
-                    reftype_items.append(item)
-                else:
-                    entity_items.append(item)
-            
-            with driver.session(database=neo4j_database) as session:
-                # Bulk create Entity nodes
+        # One session for the whole run: session open/close costs bookmark
+        # negotiation and a pool checkout, so every phase shares this one.
+        with driver.session(database=neo4j_database) as session:
+            # Create constraints and indexes
+            if create_constraints_flag:
+                create_stable_constraints(session)
+
+            if create_indexes_flag:
+                create_stable_indexes(session, check_server_version=True)
+
+            # Create schema block; one timestamp covers the whole run
+            spec_id, diagram_id = create_schema_block(
+                session, data, extracted_at_fallback=run_started_at
+            )
+            log.debug("created schema block %s/%s", spec_id, diagram_id)
+
+            # Track FQNs and kinds for relationship creation
+            entity_fqns = {}
+            entity_kinds = {}
+            n_entities = n_reftypes = n_relationships = 0
+
+            # Bulk create entities using UNWIND (performance optimization)
+            if "entities" in data:
+                # Separate entities by kind for correct label assignment
+                entity_items = []
+                reftype_items = []
+
+                for name, entity_data in data["entities"].items():
+                    item = _entity_row(name, entity_data, spec_id, diagram_id)
+
+                    # Kind and FQN are precomputed on the row, so the maps
+                    # are built client-side instead of streaming RETURN
+                    # rows back from the server
+                    kind = item["kind"]
+                    entity_kinds[name] = kind
+                    entity_fqns[name] = item["fqn"]
+                    if kind == "RefType":
+                        reftype_items.append(item)
+                    else:
+                        entity_items.append(item)
+
+                # Bulk create Entity nodes (fire-and-forget: no result rows)
                 if entity_items:
-                    query_entity = """
-                    UNWIND $entities AS ent
-                    WITH ent.entity_name AS name, ent.entity_data AS data, ent.spec_id AS spec_id,
-                         spec_id + '#' + name AS fqn
-                    MERGE (e:Entity {fqn: fqn})
-                    SET e.name = name,
-                        e.label = COALESCE(data.label, name),
-                        e.specId = spec_id,
-                        e.kind = 'Entity'
-                    RETURN e.fqn AS fqn, name AS entity_name
-                    """
-                    result = session.run(query_entity, entities=entity_items)
-                    for record in result:
-                        entity_fqns[record["entity_name"]] = record["fqn"]
-                        print(f"Created entity: {record['entity_name']} ({record['fqn']})")
-                
+                    query_entity = ENTITY_BULK_QUERY_TEMPLATE.format(label="Entity")
+                    for batch in _chunked(entity_items, batch_size):
+                        session.execute_write(
+                            lambda tx, b=batch: tx.run(query_entity, entities=b).consume()
+                        )
+
                 # Bulk create RefType nodes
                 if reftype_items:
-                    query_reftype = """
-                    UNWIND $entities AS ent
-                    WITH ent.entity_name AS name, ent.entity_data AS data, ent.spec_id AS spec_id,
-                         spec_id + '#' + name AS fqn
-                    MERGE (e:RefType {fqn: fqn})
-                    SET e.name = name,
-                        e.label = COALESCE(data.label, name),
-                        e.specId = spec_id,
-                        e.kind = 'RefType'
-                    RETURN e.fqn AS fqn, name AS entity_name
-                    """
-                    result = session.run(query_reftype, entities=reftype_items)
-                    for record in result:
-                        entity_fqns[record["entity_name"]] = record["fqn"]
-                        print(f"Created reftype: {record['entity_name']} ({record['fqn']})")
-        
-        # Bulk create fields using UNWIND
-        if "entities" in data:
-            fields_list = []
-            for entity_name, entity_data in data["entities"].items():
-                entity_fqn = entity_fqns.get(entity_name)
-                if entity_fqn and "properties" in entity_data:
-                    for field_data in entity_data["properties"]:
-                        fields_list.append({
-                            "entity_fqn": entity_fqn,
-                            "field_name": field_data.get("name", ""),
-                            "field_type": field_data.get("type", "string"),
-                            "field_required": field_data.get("required", False),
-                            "field_description": field_data.get("description"),
-                            "field_default": field_data.get("default")
-                        })
-            
-            if fields_list:
-                with driver.session(database=neo4j_database) as session:
-                    query = """
-                    UNWIND $fields AS f
-                    WITH f.entity_fqn AS entity_fqn, f.field_name AS name, f.field_type AS type,
-                         f.field_required AS required, f.field_description AS desc, f.field_default AS default_val,
-                         entity_fqn + '.' + name AS field_fqn
-                    MERGE (field:Field {fqn: field_fqn})
-                    SET field.name = name,
-                        field.type = type,
-                        field.required = required,
-                        field.entityFqn = entity_fqn,
-                        field.description = desc,
-                        field.defaultValue = default_val
-                    WITH field, entity_fqn
-                    MATCH (e) WHERE e.fqn = entity_fqn
-                    MERGE (e)-[:HAS_FIELD]->(field)
-                    """
-                    session.run(query, fields=fields_list)
-                    print(f"Created {len(fields_list)} fields")
-        
-        # Bulk create relationships using UNWIND
-        if "relationships" in data:
-            relationships_list = []
-            for rel in data["relationships"]:
-                from_entity = rel.get("from")
-                to_entity = rel.get("to")
-                
-                if from_entity and to_entity:
-                    from_fqn = entity_fqns.get(from_entity)
-                    to_fqn = entity_fqns.get(to_entity)
-                    
-                    if from_fqn and to_fqn:
-                        relationships_list.append({
-                            "from_fqn": from_fqn,
-                            "to_fqn": to_fqn,
-                            "rel_type": rel.get("type", "relates_to"),
-                            "from_cardinality": rel.get("fromCardinality") or rel.get("cardinality"),
-                            "to_cardinality": rel.get("toCardinality") or rel.get("cardinality"),
-                            "direction": rel.get("direction", "out"),
-                            "role": rel.get("role"),
-                            "name": rel.get("name"),
-                            "relationship_type": rel.get("relationshipType"),
-                            "order": rel.get("order"),
-                            "is_containment": rel.get("isContainment", False),
-                            "is_inheritance": rel.get("isInheritance", False),
-                            "is_dashed": rel.get("isDashed", False)
-                        })
-            
-            if relationships_list:
-                with driver.session(database=neo4j_database) as session:
-                    query = """
-                    UNWIND $relationships AS rel
-                    MATCH (from) WHERE from.fqn = rel.from_fqn
-                    MATCH (to) WHERE to.fqn = rel.to_fqn
-                    WITH from, to, rel,
-                         CASE rel.direction
-                           WHEN 'in' THEN false
-                           WHEN 'bidirectional' THEN true
-                           ELSE true
-                         END AS create_out,
-                         CASE rel.direction
-                           WHEN 'out' THEN false
-                           WHEN 'bidirectional' THEN true
-                           ELSE false
-                         END AS create_in
-                    FOREACH (x IN CASE WHEN create_out THEN [1] ELSE [] END |
-                      MERGE (from)-[r:RELATES_TO]->(to)
-                      SET r.type = rel.rel_type,
-                          r.direction = 'out',
-                          r.fromCardinality = rel.from_cardinality,
-                          r.toCardinality = rel.to_cardinality,
-                          r.role = rel.role,
-                          r.name = rel.name,
-                          r.relationshipType = rel.relationship_type,
-                          r.order = rel.order,
-                          r.isContainment = rel.is_containment,
-                          r.isInheritance = rel.is_inheritance,
-                          r.isDashed = rel.is_dashed
-                    )
-                    FOREACH (x IN CASE WHEN create_in THEN [1] ELSE [] END |
-                      MERGE (to)-[r:RELATES_TO]->(from)
-                      SET r.type = rel.rel_type,
-                          r.direction = 'in',
-                          r.fromCardinality = rel.to_cardinality,
-                          r.toCardinality = rel.from_cardinality,
-                          r.role = rel.role,
-                          r.name = rel.name,
-                          r.relationshipType = rel.relationship_type,
-                          r.order = rel.order,
-                          r.isContainment = rel.is_containment,
-                          r.isInheritance = rel.is_inheritance,
-                          r.isDashed = rel.is_dashed
-                    )
-                    """
-                    session.run(query, relationships=relationships_list)
-                    print(f"Created {len(relationships_list)} relationships")
-        
-        # Link schema block to entities
-        with driver.session(database=neo4j_database) as session:
-            session.run("""
-                MATCH (sb:SchemaBlock {diagramId: $diagram_id})
-                MATCH (e) WHERE e.specId = $spec_id
-                MERGE (sb)-[:CONTAINS_ENTITY]->(e)
-            """, spec_id=spec_id, diagram_id=diagram_id)
-        
-        print("Neo4j population completed successfully!")
-    
+                    query_reftype = ENTITY_BULK_QUERY_TEMPLATE.format(label="RefType")
+                    for batch in _chunked(reftype_items, batch_size):
+                        session.execute_write(
+                            lambda tx, b=batch: tx.run(query_reftype, entities=b).consume()
+                        )
+
+                n_entities, n_reftypes = len(entity_items), len(reftype_items)
+
+            # Bulk create relationships using UNWIND
+            if "relationships" in data:
+                relationships_list = []
+                # Local bindings skip the attribute lookups inside the loop
+                efqns_get = entity_fqns.get
+                ekinds_get = entity_kinds.get
+                rels_append = relationships_list.append
+                for rel in data["relationships"]:
+                    from_entity = rel.get("from")
+                    to_entity = rel.get("to")
+
+                    if from_entity and to_entity:
+                        from_fqn = efqns_get(from_entity)
+                        to_fqn = efqns_get(to_entity)
+
+                        if from_fqn and to_fqn:
+                            rels_append({
+                                "from_fqn": from_fqn,
+                                "to_fqn": to_fqn,
+                                "from_kind": ekinds_get(from_entity, "Entity"),
+                                "to_kind": ekinds_get(to_entity, "Entity"),
+                                "rel_type": rel.get("type", "relates_to"),
+                                "from_cardinality": rel.get("fromCardinality") or rel.get("cardinality"),
+                                "to_cardinality": rel.get("toCardinality") or rel.get("cardinality"),
+                                "direction": rel.get("direction", "out"),
+                                "role": rel.get("role"),
+                                "name": rel.get("name"),
+                                "relationship_type": rel.get("relationshipType"),
+                                "order": rel.get("order"),
+                                "is_containment": rel.get("isContainment", False),
+                                "is_inheritance": rel.get("isInheritance", False),
+                                "is_dashed": rel.get("isDashed", False)
+                            })
+
+                if relationships_list:
+                    directed_rows = _directed_relationship_rows(relationships_list)
+                    for (from_kind, to_kind), bucket in _bucket_relationships(directed_rows).items():
+                        query_rel = RELATIONSHIP_BULK_QUERY_TEMPLATE.format(
+                            from_label=from_kind, to_label=to_kind
+                        )
+                        for batch in _chunked(bucket, batch_size):
+                            session.execute_write(
+                                lambda tx, b=batch, q=query_rel: tx.run(q, relationships=b).consume()
+                            )
+                    n_relationships = len(relationships_list)
+
+        log.info(
+            "populated %s/%s: entities=%d reftypes=%d relationships=%d",
+            spec_id, diagram_id, n_entities, n_reftypes, n_relationships
+        )
+
     finally:
-        driver.close()
+        if owns_driver:
+            driver.close()
 
 
 if __name__ == "__main__":
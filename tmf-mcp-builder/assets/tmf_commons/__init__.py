@@ -4,10 +4,9 @@ from .api_builder import create_tmf_app
 from .event_utils import add_event_handlers
 import uuid
 
-def get_storage():
-    """Get the global data storage"""
-    from .api_builder import data_storage
-    return data_storage
+def get_storage(app):
+    """Get the per-app data storage"""
+    return app.state.storage
 
 def generate_uuid():
     """Generate a UUID string"""
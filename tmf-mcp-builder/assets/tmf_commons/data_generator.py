@@ -1,11 +1,60 @@
+import functools
 import random
+import time
 import uuid
-from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Any, Callable, Dict, List, Tuple
+
+_DAY = 86400
+
+# Stable stand-in for absent sub-schemas: plans are cached by schema
+# identity, and an ephemeral {} literal dies after compilation, letting a
+# later allocation alias its id() and hit the wrong cache entry
+_EMPTY_SCHEMA: Dict[str, Any] = {}
+
+
+def _iso_at(secs: float) -> str:
+    """Epoch seconds as an ISO-8601 'Z' string, skipping datetime objects"""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(secs))
+
+
+@functools.lru_cache(maxsize=1024)
+def _classify(property_name: str) -> str:
+    """Classify a property name for string generation ('id', 'name' or
+    'default'). TMF schemas reuse a few dozen field names thousands of
+    times, so the lowercase+substring scan is memoized per name."""
+    lowered = property_name.lower()
+    if 'id' in lowered:
+        return 'id'
+    if 'name' in lowered:
+        return 'name'
+    return 'default'
+
 
 class DataGenerator:
     def __init__(self, spec: Dict):
         self.spec = spec
+        # Lazily-populated $ref -> schema cache: TMF specs repeat the same
+        # refs hundreds of times, each otherwise re-walking the spec dict
+        self._ref_cache: Dict[str, Any] = {}
+        # Compiled generator plans keyed by (schema identity, property
+        # name): schemas are static after load so the structure walk
+        # happens once per pairing, and a component shared by several
+        # properties still compiles per property (string branches embed
+        # the property name in the plan)
+        self._plan_cache: Dict[Tuple[int, str], Callable[[], Any]] = {}
+
+    def _resolve_ref(self, ref_path: str) -> Any:
+        """Resolve a local $ref, memoized per path (None when unresolvable)"""
+        cached = self._ref_cache.get(ref_path)
+        if cached is None and ref_path not in self._ref_cache:
+            resolved = None
+            if ref_path.startswith('#/'):
+                node = self.spec
+                for part in ref_path[2:].split('/'):
+                    node = node.get(part, {})
+                resolved = node or None
+            self._ref_cache[ref_path] = cached = resolved
+        return cached
 
     def generate_id(self) -> str:
         """Generate a UUID string"""
@@ -13,21 +62,23 @@ class DataGenerator:
         
     def generate_time_period(self) -> Dict[str, str]:
         """Generate a time period for validFor"""
-        start_date = datetime.now() - timedelta(days=random.randint(0, 365))
-        end_date = start_date + timedelta(days=random.randint(365, 1095))
+        # Plain epoch arithmetic: no datetime/timedelta objects per call
+        start = time.time() - random.randint(0, 365) * _DAY
+        end = start + random.randint(365, 1095) * _DAY
         return {
-            "startDateTime": start_date.isoformat() + "Z",
-            "endDateTime": end_date.isoformat() + "Z"
+            "startDateTime": _iso_at(start),
+            "endDateTime": _iso_at(end)
         }
 
     def generate_contextual_fallback_data(self, ref_path: str) -> Any:
         """Generate contextual fallback data for common TMF references (from prompt)"""
         ref_name = ref_path.split('/')[-1]
         
+        uid = str(uuid.uuid4())
         if 'PartyRole' in ref_name:
             return {
-                "id": str(uuid.uuid4()),
-                "href": f"/tmf-api/customer/v5/partyRole/{uuid.uuid4()}",
+                "id": uid,
+                "href": f"/tmf-api/customer/v5/partyRole/{uid}",
                 "name": f"Party Role {random.randint(1000, 9999)}",
                 "description": f"Description for {ref_name}",
                 "role": "customer",
@@ -37,23 +88,19 @@ class DataGenerator:
         # ... (add more from your prompt's full function)
         else:
             return {
-                "id": str(uuid.uuid4()),
-                "href": f"/tmf-api/{ref_name.lower()}/{uuid.uuid4()}",
+                "id": uid,
+                "href": f"/tmf-api/{ref_name.lower()}/{uid}",
                 "name": f"{ref_name} {random.randint(1000, 9999)}"
             }
 
     def generate_sample_data(self, schema: Dict[str, Any], path: str = "", property_name: str = "") -> Any:
         """Generate realistic sample data based on OpenAPI schema (enhanced from TMF637 reference)"""
-        # Handle $ref
+        # Handle $ref (memoized: same refs recur constantly in TMF specs)
         if '$ref' in schema:
             ref_path = schema['$ref']
-            if ref_path.startswith('#/'):
-                parts = ref_path[2:].split('/')
-                ref_schema = self.spec
-                for part in parts:
-                    ref_schema = ref_schema.get(part, {})
-                if ref_schema:
-                    return self.generate_sample_data(ref_schema, path, property_name)
+            ref_schema = self._resolve_ref(ref_path)
+            if ref_schema is not None:
+                return self.generate_sample_data(ref_schema, path, property_name)
             return self.generate_contextual_fallback_data(ref_path)
         
         # Handle allOf (from prompt)
@@ -79,19 +126,84 @@ class DataGenerator:
             return [self.generate_sample_data(items_schema, f"{path}[{i}]", property_name) for i in range(count)]
         elif schema_type == 'string':
             # TMF637-style contextual generation
-            if 'id' in property_name.lower():
+            kind = _classify(property_name)
+            if kind == 'id':
                 return str(uuid.uuid4())
-            elif 'name' in property_name.lower():
+            elif kind == 'name':
                 return f"Sample {property_name.title()} {random.randint(1, 100)}"
             # ... (add more from TMF637's full logic)
             else:
                 return "sample-value"
         # Add handling for number, integer, boolean, etc. (from prompt/TMF637)
 
-    def initialize_storage(self, resource: str, schema_name: str, count: int = 5) -> None:
-        """Pre-populate storage with sample data (from TMF637 reference)"""
+    def _compile(self, schema: Dict[str, Any], property_name: str = "") -> Callable[[], Any]:
+        """
+        Partially evaluate a schema into a zero-arg generator closure.
+        All $ref/allOf/type/properties introspection happens here, once;
+        the returned closure only draws random values, so generating N
+        instances of a resource walks the schema structure once instead
+        of N times.
+        """
+        plan_key = (id(schema), property_name)
+        cached = self._plan_cache.get(plan_key)
+        if cached is not None:
+            return cached
+
+        if '$ref' in schema:
+            ref_path = schema['$ref']
+            ref_schema = self._resolve_ref(ref_path)
+            if ref_schema is not None:
+                plan = self._compile(ref_schema, property_name)
+            else:
+                plan = lambda: self.generate_contextual_fallback_data(ref_path)
+        elif 'allOf' in schema:
+            sub_plans = [self._compile(s, property_name) for s in schema['allOf']]
+
+            def plan():
+                result = {}
+                for sub in sub_plans:
+                    sub_data = sub()
+                    if isinstance(sub_data, dict):
+                        result.update(sub_data)
+                return result
+        else:
+            schema_type = schema.get('type', 'object')
+            if schema_type == 'object':
+                prop_plans = [
+                    (name, self._compile(prop_schema, name))
+                    for name, prop_schema in schema.get('properties', {}).items()
+                ]
+                plan = lambda: {name: fn() for name, fn in prop_plans}
+            elif schema_type == 'array':
+                items_fn = self._compile(schema.get('items') or _EMPTY_SCHEMA, property_name)
+                randint = random.randint
+                plan = lambda: [items_fn() for _ in range(randint(1, 3))]
+            elif schema_type == 'string':
+                # Branch on the property name at compile time, not per draw
+                kind = _classify(property_name)
+                if kind == 'id':
+                    plan = lambda: str(uuid.uuid4())
+                elif kind == 'name':
+                    title = f"Sample {property_name.title()}"
+                    randint = random.randint
+                    plan = lambda: f"{title} {randint(1, 100)}"
+                else:
+                    plan = lambda: "sample-value"
+            else:
+                plan = lambda: None
+
+        self._plan_cache[plan_key] = plan
+        return plan
+
+    def initialize_storage(self, resource: str, schema_name: str, storage: Dict[str, Any], count: int = 5) -> None:
+        """Pre-populate the given app storage with sample data keyed by id
+        (from TMF637 reference)"""
         schema = self.spec['components']['schemas'].get(schema_name, {})
-        items = [self.generate_sample_data(schema) for _ in range(count)]
-        for item in items:
-            item['id'] = str(uuid.uuid4())
-        storage[resource] = items  # Assuming global storage; adjust as needed 
\ No newline at end of file
+        generate = self._compile(schema)
+        items = {}
+        for _ in range(count):
+            item = generate()
+            item_id = str(uuid.uuid4())
+            item['id'] = item_id
+            items[item_id] = item
+        storage[resource] = items 
\ No newline at end of file
@@ -14,25 +14,129 @@ from __future__ import annotations
 
 import argparse
 import json
-from collections import defaultdict
+import sys
+from operator import itemgetter
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# CSafeLoader parses through LibYAML when present (~10x faster than the
+# pure-Python SafeLoader on multi-MB TMF specs); same safe semantics
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# The only top-level keys inventory() reads; everything else in the spec
+# (examples, descriptions of unused sections, vendor extensions) is
+# parsed but never turned into Python objects
+_TOP_KEYS = frozenset(("info", "servers", "paths", "components"))
+
+
+def _load_spec_yaml(fh) -> Any:
+    """
+    Parse the spec but construct Python objects only for the top-level
+    subtrees the inventory uses. Parsing still sees the whole document
+    (LibYAML, cheap); skipping construction of unused subtrees is what
+    saves time and peak memory on multi-MB specs.
+    """
+    loader = _YAML_LOADER(fh)
+    try:
+        node = loader.get_single_node()
+        if isinstance(node, yaml.MappingNode):
+            node.value = [
+                (k, v) for k, v in node.value
+                if isinstance(k, yaml.ScalarNode) and k.value in _TOP_KEYS
+            ]
+        return loader.construct_document(node) if node is not None else None
+    finally:
+        loader.dispose()
+
+
+# Per-run memo tables, cleared at the start of inventory(). TMF specs
+# reference the same components dozens of times; without these each hit
+# re-walks the spec dict (and re-merges the same allOf trees). Keys
+# include id(spec) because dicts are unhashable and several specs may be
+# processed in one process.
+_REF_CACHE: Dict[Tuple[int, str], Optional[Dict[str, Any]]] = {}
+_FIELDS_CACHE: Dict[Tuple[int, str], Dict[str, Any]] = {}
+_MERGE_CACHE: Dict[int, Dict[str, Any]] = {}
+_REF_INDEX: Dict[int, Dict[str, Dict[str, Any]]] = {}
+
+
+def _clear_caches() -> None:
+    _REF_CACHE.clear()
+    _FIELDS_CACHE.clear()
+    _MERGE_CACHE.clear()
+    _REF_INDEX.clear()
+
+
+def _build_ref_index(spec: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Flatten components/* into {"#/components/<section>/<name>": node}
+    in one pass, so the thousands of ref lookups a large spec triggers
+    become single dict hits instead of split-and-walk traversals."""
+    index: Dict[str, Dict[str, Any]] = {}
+    components = spec.get("components")
+    if isinstance(components, dict):
+        for section, members in components.items():
+            if not isinstance(members, dict):
+                continue
+            prefix = f"#/components/{section}/"
+            for name, node in members.items():
+                if isinstance(node, dict):
+                    index[prefix + name] = node
+    return index
 
-def _resolve_ref(spec: Dict[str, Any], ref: str) -> Optional[Dict[str, Any]]:
-    if not ref.startswith("#/"):
-        return None
-    node: Any = spec
-    for part in ref[2:].split("/"):
-        if not isinstance(node, dict) or part not in node:
-            return None
-        node = node[part]
-    return node if isinstance(node, dict) else None
 
+def _resolve_ref(spec: Dict[str, Any], ref: str) -> Optional[Dict[str, Any]]:
+    key = (id(spec), ref)
+    if key in _REF_CACHE:
+        return _REF_CACHE[key]
+
+    index = _REF_INDEX.get(id(spec))
+    if index is None:
+        index = _REF_INDEX[id(spec)] = _build_ref_index(spec)
+
+    resolved = index.get(ref)
+    if resolved is None and ref.startswith("#/"):
+        # Generic walk for the rare ref outside components/*
+        node: Any = spec
+        for part in ref[2:].split("/"):
+            if not isinstance(node, dict) or part not in node:
+                node = None
+                break
+            node = node[part]
+        resolved = node if isinstance(node, dict) else None
+
+    _REF_CACHE[key] = resolved
+    return resolved
+
+
+def _merge_allof(
+    spec: Dict[str, Any],
+    schema: Dict[str, Any],
+    _seen: Optional[set] = None,
+) -> Dict[str, Any]:
+    # _seen carries the ref URIs already merged on this call chain: a
+    # schema whose allOf transitively references itself (legal in JSON
+    # Schema) terminates instead of looping, and a component repeated
+    # within one allOf tree is merged once. Cache only top-level results
+    # so partial merges from inside a cycle are never shared.
+    # Nothing to merge: hand the schema back untouched (callers treat
+    # results as read-only), skipping the copy and the cache entry
+    if not schema.get("allOf"):
+        return schema
+
+    top_level = _seen is None
+    if top_level:
+        cached = _MERGE_CACHE.get(id(schema))
+        if cached is not None:
+            return cached
+        _seen = set()
 
-def _merge_allof(spec: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
     merged: Dict[str, Any] = {}
 
     def merge_into(dst: Dict[str, Any], src: Dict[str, Any]) -> None:
@@ -55,58 +159,96 @@ def _merge_allof(spec: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]
         if not isinstance(sub, dict):
             continue
         if "$ref" in sub and isinstance(sub["$ref"], str):
-            resolved = _resolve_ref(spec, sub["$ref"])
+            ref = sub["$ref"]
+            if ref in _seen:
+                continue
+            _seen.add(ref)
+            resolved = _resolve_ref(spec, ref)
             if resolved:
-                merge_into(merged, _merge_allof(spec, resolved))
+                # Recurse only for composed schemas; plain components
+                # merge directly without another call layer
+                merge_into(merged, _merge_allof(spec, resolved, _seen) if "allOf" in resolved else resolved)
                 continue
-        merge_into(merged, _merge_allof(spec, sub) if "allOf" in sub else sub)
+        merge_into(merged, _merge_allof(spec, sub, _seen) if "allOf" in sub else sub)
 
     merged.pop("allOf", None)
+    if top_level:
+        _MERGE_CACHE[id(schema)] = merged
     return merged
 
 
 def _extract_fields(spec: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
-    if "$ref" in schema and isinstance(schema["$ref"], str):
-        resolved = _resolve_ref(spec, schema["$ref"])
-        if resolved:
-            return _extract_fields(spec, resolved)
-
-    if "allOf" in schema:
+    cache_key = None
+    if isinstance(schema.get("$ref"), str):
+        # Callers treat results as read-only JSON, so one computed dict
+        # can be shared by every operation referencing the same component
+        cache_key = (id(spec), schema["$ref"])
+        cached = _FIELDS_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        # Chase the ref chain iteratively (PartyRef -> RelatedParty -> ...)
+        # instead of a Python call per hop; seen refs stop cycles
+        seen = set()
+        while isinstance(schema.get("$ref"), str):
+            ref = schema["$ref"]
+            if ref in seen:
+                break
+            seen.add(ref)
+            resolved = _resolve_ref(spec, ref)
+            if not resolved:
+                break
+            schema = resolved
+
+    if schema.get("allOf"):
         schema = _merge_allof(spec, schema)
 
     properties = schema.get("properties") if isinstance(schema.get("properties"), dict) else {}
     required = schema.get("required") if isinstance(schema.get("required"), list) else []
+    # Set for the per-field membership test (the list stays in the output
+    # to preserve the spec's declared ordering)
+    required_set = set(required)
 
     # Only top-level fields; nested objects are represented by name only.
+    # Record assembly is the dominant per-field cost, so keep it lean:
+    # bound append, no per-field branch state, rpartition over split
     fields: List[Dict[str, Any]] = []
+    fields_append = fields.append
     for name, prop in properties.items():
-        field_type = None
         if isinstance(prop, dict):
-            field_type = prop.get("type")
-            if not field_type and "$ref" in prop:
-                field_type = prop["$ref"].split("/")[-1]
-        fields.append({
+            field_type = prop.get("type") \
+                or (prop["$ref"].rpartition("/")[2] if "$ref" in prop else None)
+        else:
+            field_type = None
+        fields_append({
             "name": name,
-            "required": name in required,
+            "required": name in required_set,
             "type": field_type,
         })
 
-    return {
+    # Decorate-sort-undecorate: the (required, name) key is computed once
+    # per field instead of twice per comparison in a Python-level lambda
+    fields = [f for _, _, f in sorted((not f["required"], f["name"], f) for f in fields)]
+
+    result = {
         "type": schema.get("type"),
         "schema": schema.get("title") or schema.get("$id"),
         "required": required,
-        "fields": sorted(fields, key=lambda f: (not f["required"], f["name"])),
+        "fields": fields,
     }
+    if cache_key is not None:
+        _FIELDS_CACHE[cache_key] = result
+    return result
 
 
 def _pick_json_schema(request_body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    content = request_body.get("content") if isinstance(request_body.get("content"), dict) else None
-    if not content:
+    content = request_body.get("content")
+    if not isinstance(content, dict):
         return None
 
     for ctype in ("application/json", "application/*+json", "*/*"):
-        if ctype in content and isinstance(content[ctype], dict):
-            schema = content[ctype].get("schema")
+        entry = content.get(ctype)
+        if isinstance(entry, dict):
+            schema = entry.get("schema")
             return schema if isinstance(schema, dict) else None
 
     # fallback: first content entry
@@ -117,19 +259,38 @@ def _pick_json_schema(request_body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     return None
 
 
-def _group_key(path: str) -> str:
-    parts = [p for p in path.split("/") if p]
-    return parts[0] if parts else ""
+_METHODS = ("get", "post", "put", "patch", "delete")
+_WRITE_METHODS = frozenset(("post", "put", "patch"))
+
+
+def _validate(spec: Any) -> Dict[str, Any]:
+    """Check the top-level spec shape once, so the hot helpers and the
+    inventory loop can assume well-formed mappings instead of re-guarding
+    the same values on every call."""
+    if not isinstance(spec, dict):
+        raise SystemExit("Spec did not parse to a JSON object")
+    for key, kind in (("paths", dict), ("components", dict), ("info", dict), ("servers", list)):
+        value = spec.get(key)
+        if value is not None and not isinstance(value, kind):
+            raise SystemExit(f"Spec '{key}' must be a {kind.__name__}")
+    for path, path_item in (spec.get("paths") or {}).items():
+        if not isinstance(path_item, dict):
+            raise SystemExit(f"Spec path item {path!r} must be a mapping")
+    return spec
 
 
 def inventory(spec: Dict[str, Any]) -> Dict[str, Any]:
-    paths = spec.get("paths") if isinstance(spec.get("paths"), dict) else {}
+    _clear_caches()
+    paths = spec.get("paths") or {}
 
-    grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
     for path, path_item in paths.items():
-        if not isinstance(path_item, dict):
-            continue
-        for method in ("get", "post", "put", "patch", "delete"):
+        # Group key from one partition (no intermediate list); the bucket
+        # is created lazily on the first entry so path items with no
+        # inventoried methods (e.g. parameters-only) emit no empty group
+        key = path.lstrip("/").partition("/")[0]
+        entries = grouped.get(key)
+        for method in _METHODS:
             op = path_item.get(method)
             if not isinstance(op, dict):
                 continue
@@ -141,27 +302,31 @@ def inventory(spec: Dict[str, Any]) -> Dict[str, Any]:
                 "summary": op.get("summary") or op.get("description"),
             }
 
-            if method in ("post", "put", "patch"):
-                rb = op.get("requestBody") if isinstance(op.get("requestBody"), dict) else None
-                if rb:
+            if method in _WRITE_METHODS:
+                rb = op.get("requestBody")
+                if isinstance(rb, dict):
                     schema = _pick_json_schema(rb)
                     if schema:
                         entry["requestFields"] = _extract_fields(spec, schema)
 
-            grouped[_group_key(path)].append(entry)
+            if entries is None:
+                entries = grouped[key] = []
+            entries.append(entry)
+
+    # Sort every bucket in place in one pass, then emit in key order
+    entry_order = itemgetter("path", "method")
+    for entries in grouped.values():
+        entries.sort(key=entry_order)
 
     # metadata
-    info = spec.get("info") if isinstance(spec.get("info"), dict) else {}
-    servers = spec.get("servers") if isinstance(spec.get("servers"), list) else []
+    info = spec.get("info") or {}
+    servers = spec.get("servers") or []
 
     return {
         "title": info.get("title"),
         "version": info.get("version"),
         "servers": [s.get("url") for s in servers if isinstance(s, dict) and s.get("url")],
-        "resources": {
-            k: sorted(v, key=lambda e: (e["path"], e["method"]))
-            for k, v in sorted(grouped.items(), key=lambda kv: kv[0])
-        },
+        "resources": {k: grouped[k] for k in sorted(grouped)},
     }
 
 
@@ -172,17 +337,30 @@ def main() -> int:
     args = parser.parse_args()
 
     spec_path = Path(args.spec)
-    spec = yaml.safe_load(spec_path.read_text(encoding="utf-8"))
-    if not isinstance(spec, dict):
-        raise SystemExit("Spec did not parse to a JSON object")
-
-    result = inventory(spec)
-    data = json.dumps(result, indent=2, ensure_ascii=False)
+    if spec_path.suffix.lower() == ".json":
+        # OpenAPI specs may be JSON; json/orjson parse an order of
+        # magnitude faster than the YAML path, so never route JSON
+        # input through the YAML parser
+        raw = spec_path.read_bytes()
+        spec = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    else:
+        # Binary handle straight to the loader: LibYAML decodes as it
+        # parses, without materializing the whole file as a Python str
+        with spec_path.open("rb") as fh:
+            spec = _load_spec_yaml(fh)
+
+    result = inventory(_validate(spec))
+    # orjson serializes straight to UTF-8 bytes several times faster than
+    # stdlib json on megabyte-scale inventories
+    if orjson is not None:
+        data = orjson.dumps(result, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(result, indent=2, ensure_ascii=False).encode("utf-8")
 
     if args.out:
-        Path(args.out).write_text(data + "\n", encoding="utf-8")
+        Path(args.out).write_bytes(data + b"\n")
     else:
-        print(data)
+        sys.stdout.buffer.write(data + b"\n")
 
     return 0
 